@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -74,11 +75,70 @@ WSGI_APPLICATION = 'core.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+SQLITE_PATH = Path(os.environ.get("DJANGO_SQLITE_PATH", BASE_DIR / "db.sqlite3"))
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "NAME": SQLITE_PATH,
+    }
+}
+
+# Perfil de produção do SQLite (DJANGO_DB_PROFILE=prod):
+# WAL (leituras não esperam a importação), pragmas aplicados a cada conexão,
+# conexões persistentes e um alias "leitura" (query_only) para métricas e listagens.
+DB_PROFILE = os.environ.get("DJANGO_DB_PROFILE", "dev")
+
+SQLITE_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL;"
+    "PRAGMA cache_size=-65536;"        # 64 MiB
+    "PRAGMA mmap_size=268435456;"      # 256 MiB
+    "PRAGMA busy_timeout=5000;"        # ms
+    "PRAGMA temp_store=MEMORY;"
+)
+
+if DB_PROFILE == "prod":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": SQLITE_PATH,
+            "CONN_MAX_AGE": 600,
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {
+                "init_command": "PRAGMA journal_mode=WAL;" + SQLITE_PRAGMAS,
+                # pega o lock de escrita no BEGIN: evita "database is locked" no upgrade de leitura p/ escrita
+                "transaction_mode": "IMMEDIATE",
+            },
+        },
+        "leitura": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": SQLITE_PATH,
+            "CONN_MAX_AGE": 600,
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {
+                # WAL aqui também: o arquivo pode ser aberto primeiro por este alias
+                "init_command": "PRAGMA journal_mode=WAL;" + SQLITE_PRAGMAS + "PRAGMA query_only=ON;",
+            },
+            "TEST": {"MIRROR": "default"},
+        },
     }
+
+DATABASE_ROUTERS = ["inventario.routers.LeituraRouter"]
+
+
+# Django REST framework
+# FastJSONRenderer/FastJSONParser usam orjson quando instalado (senão, json da stdlib)
+
+REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": [
+        "inventario.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "inventario.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
 
 
@@ -1,12 +1,25 @@
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from inventario.views import PatrimonioViewSet
+from inventario import async_views
+from inventario.views import (
+    PatrimonioViewSet, duplicados, fila_concluir, fila_reservar, fila_status, metrics_overview, metrics_timeseries,
+)
 
 router = DefaultRouter()
 router.register(r'patrimonios', PatrimonioViewSet, basename='patrimonio')
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/duplicados/', duplicados, name='duplicados'),
+    path('api/metrics/overview/', metrics_overview, name='metrics-overview'),
+    path('api/metrics/timeseries/', metrics_timeseries, name='metrics-timeseries'),
+    path('api/fila/pendentes/', fila_status, name='fila-status'),
+    path('api/fila/pendentes/reservar/', fila_reservar, name='fila-reservar'),
+    path('api/fila/pendentes/concluir/', fila_concluir, name='fila-concluir'),
+    # versões assíncronas (servir via core.asgi)
+    path('api/async/metrics/overview/', async_views.metrics_overview, name='async-metrics-overview'),
+    path('api/async/metrics/timeseries/', async_views.metrics_timeseries, name='async-metrics-timeseries'),
+    path('api/async/patrimonios/', async_views.patrimonios, name='async-patrimonios'),
     path('api/', include(router.urls)),
 ]
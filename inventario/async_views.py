@@ -0,0 +1,81 @@
+# inventario/async_views.py
+"""
+Versões assíncronas (ASGI) das métricas e da listagem somente leitura.
+O trabalho de banco de cada requisição roda numa única ida a uma thread do
+pool (com a conexão dela) e o event loop fica livre enquanto o banco responde.
+Não dividimos uma requisição em várias threads: no SQLite as consultas
+disputam o mesmo arquivo e o GIL, e abrir uma conexão por consulta custava
+mais do que o paralelismo rendia (bench_asgi).
+"""
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.http import HttpResponse
+from django.utils.timezone import now
+from django.views.decorators.http import require_GET
+
+from .models import Patrimonio
+from .renderers import FastJSONRenderer
+from .routers import somente_leitura
+from .serializers import serializar_valores
+from .views import overview_agregados, overview_payload, timeseries_payload, timeseries_queryset
+
+_renderer = FastJSONRenderer()
+
+
+def _json(data, status=200):
+    return HttpResponse(_renderer.render(data), status=status, content_type="application/json")
+
+
+def _em_thread(fn):
+    """
+    Executa fn() fora do event loop. thread_sensitive=False permite que
+    requisições diferentes rodem ao mesmo tempo, cada uma na conexão da sua thread.
+    """
+    def run():
+        try:
+            return fn()
+        finally:
+            close_old_connections()
+    return sync_to_async(run, thread_sensitive=False)()
+
+
+@require_GET
+@somente_leitura
+async def metrics_overview(request):
+    """
+    Resumo para cards: hoje, semana.
+    """
+    today = now().date()
+    return _json(overview_payload(await _em_thread(lambda: overview_agregados(today))))
+
+
+@require_GET
+@somente_leitura
+async def metrics_timeseries(request):
+    """
+    Série temporal para o gráfico (por dia).
+    Query params opcionais: ?from=YYYY-MM-DD&to=YYYY-MM-DD
+    """
+    qs = timeseries_queryset(request.GET)
+    payload = await _em_thread(lambda: timeseries_payload(qs))
+    return _json(payload)
+
+
+@require_GET
+@somente_leitura
+async def patrimonios(request):
+    """
+    Listagem somente leitura, mais recentes primeiro.
+    Query params opcionais: ?limit=N (padrão: 100, máx.: 1000)&offset=N
+    """
+    try:
+        limit = max(1, min(int(request.GET.get("limit") or 100), 1000))
+        offset = max(0, int(request.GET.get("offset") or 0))
+    except ValueError:
+        return _json({"detail": "limit/offset devem ser inteiros"}, status=400)
+
+    qs = Patrimonio.objects.all().order_by("-id")
+
+    def consultar():
+        return {"count": qs.count(), "results": serializar_valores(qs[offset:offset + limit])}
+    return _json(await _em_thread(consultar))
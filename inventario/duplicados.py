@@ -0,0 +1,45 @@
+# inventario/duplicados.py
+from itertools import groupby
+from operator import itemgetter
+from typing import Any, Dict, Iterator
+
+from .models import Patrimonio
+
+# critério -> coluna indexada usada como chave de agrupamento
+CRITERIOS = {
+    "hash": "content_hash",
+    "codigo": "cod_normalizado",
+}
+
+
+def iter_grupos(
+    criterio: str, min_tamanho: int = 2, chunk_size: int = 5000, depois: str = ""
+) -> Iterator[Dict[str, Any]]:
+    """
+    Percorre a tabela uma única vez, ordenada pela coluna do critério
+    (a ordenação sai do índice), e emite os grupos consecutivos com a
+    mesma chave. Memória ~ tamanho do maior grupo, não da tabela.
+    `depois` é um cursor: só grupos com chave maior que ele (paginação).
+    """
+    campo = CRITERIOS[criterio]
+    qs = Patrimonio.objects.exclude(**{campo: ""})
+    if depois:
+        qs = qs.filter(**{f"{campo}__gt": depois})
+    rows = (
+        qs.order_by(campo, "id")
+        .values_list(campo, "id", "cod_patrimonio", "checklist")
+        .iterator(chunk_size=chunk_size)
+    )
+    for chave, itens in groupby(rows, key=itemgetter(0)):
+        itens = list(itens)
+        if len(itens) < min_tamanho:
+            continue
+        yield {
+            "criterio": criterio,
+            "chave": chave,
+            "total": len(itens),
+            "registros": [
+                {"id": pk, "cod_patrimonio": cod, "checklist": checklist}
+                for _, pk, cod, checklist in itens
+            ],
+        }
@@ -0,0 +1,39 @@
+# inventario/fastjson.py
+"""
+JSON rápido quando o orjson estiver instalado; senão, cai no json da stdlib.
+A saída segue o formato do JSONRenderer do DRF (datas com 'Z', sem escapar unicode).
+Como o JSONParser do DRF, loads() recusa NaN/Infinity nos dois backends.
+dumps() com NaN/Infinity: a stdlib levanta ValueError (como o JSONRenderer);
+o orjson não tem essa opção e escreve null (JSON válido).
+"""
+import json
+
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.json import strict_constant
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende do ambiente
+    orjson = None
+
+_encoder = JSONEncoder()
+
+if orjson is not None:
+    # datetimes passam pelo encoder do DRF para manter o sufixo 'Z'
+    _OPTS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+    def dumps(data) -> bytes:
+        return orjson.dumps(data, default=_encoder.default, option=_OPTS)
+
+    def loads(raw):
+        return orjson.loads(raw)
+else:
+    def dumps(data) -> bytes:
+        return json.dumps(
+            data, cls=JSONEncoder, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode()
+
+    def loads(raw):
+        if isinstance(raw, (bytes, bytearray, memoryview)):
+            raw = bytes(raw).decode("utf-8")
+        return json.loads(raw, parse_constant=strict_constant)
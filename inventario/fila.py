@@ -0,0 +1,142 @@
+# inventario/fila.py
+"""
+Fila de reprocessamento dos registros PEND.
+
+Workers reservam lotes (reservar) e devolvem o resultado (concluir).
+A reserva expira sozinha: se o worker morrer, o lote volta para a fila.
+Registro que falha de novo volta com backoff (proxima_tentativa) e, após
+MAX_TENTATIVAS falhas, fica estacionado. A fila entrega por
+(proxima_tentativa, id) pelo índice parcial de pendentes, então o custo
+é O(lote), não O(tabela).
+"""
+from datetime import timedelta
+from typing import Any, Dict, Iterable, List
+from uuid import uuid4
+
+from django.db import transaction
+from django.db.models import F, Q, Subquery
+from django.utils.timezone import now
+
+from .models import Patrimonio, eh_pendente, normalizar_codigo
+
+RESERVA_PADRAO = timedelta(minutes=10)
+RESERVA_MAXIMA = timedelta(hours=6)
+LOTE_MAXIMO = 500
+
+# backoff após falha: BACKOFF_BASE * 2^(tentativas-1), até BACKOFF_MAXIMO
+BACKOFF_BASE = timedelta(minutes=5)
+BACKOFF_MAXIMO = timedelta(days=1)
+MAX_TENTATIVAS = 5
+# estacionado: fica no fim do índice e fora da fila até alguém zerar as tentativas
+ESTACIONADO = timedelta(days=3650)
+
+# o que o worker precisa para rodar o OCR de novo
+CAMPOS_LOTE = ("id", "cod_patrimonio", "checklist", "arquivo", "dropbox_link", "dropbox_path", "content_hash", "tentativas")
+
+
+def _livres(agora):
+    return Patrimonio.objects.filter(pendente=True, tentativas__lt=MAX_TENTATIVAS).filter(
+        Q(proxima_tentativa__isnull=True) | Q(proxima_tentativa__lt=agora)
+    )
+
+
+def backoff(tentativas: int) -> timedelta:
+    if tentativas >= MAX_TENTATIVAS:
+        return ESTACIONADO
+    return min(BACKOFF_BASE * (2 ** max(tentativas - 1, 0)), BACKOFF_MAXIMO)
+
+
+def reservar(tamanho: int, duracao: timedelta = RESERVA_PADRAO) -> Dict[str, Any]:
+    """
+    Reserva até `tamanho` pendentes livres (nunca tentados, com reserva
+    vencida ou com backoff cumprido) para um worker.
+
+    Um único UPDATE ... WHERE id IN (SELECT ... LIMIT n): no SQLite a escrita
+    pega o lock direto (sem promover um lock de leitura, que daria
+    "database is locked"); a condição de livre se repete no UPDATE para que
+    um id disputado por dois workers fique só com um.
+    A releitura do lote vai pelo índice parcial: todo o lote recebeu
+    proxima_tentativa=reserva_ate, e o token separa reservas do mesmo instante.
+    """
+    agora = now()
+    token = uuid4().hex
+    reserva_ate = agora + duracao
+
+    candidatos = (
+        _livres(agora)
+        .order_by(F("proxima_tentativa").asc(nulls_first=True), "id")
+        .values("id")[:tamanho]
+    )
+    _livres(agora).filter(id__in=Subquery(candidatos)).update(
+        proxima_tentativa=reserva_ate, reserva_token=token
+    )
+
+    registros = list(lote(token, reserva_ate).values(*CAMPOS_LOTE))
+    return {"token": token, "reserva_ate": reserva_ate, "registros": registros}
+
+
+def lote(token: str, reserva_ate):
+    """Registros reservados com `token` (busca no índice parcial, em ordem de id)."""
+    return Patrimonio.objects.filter(
+        pendente=True, proxima_tentativa=reserva_ate, reserva_token=token
+    ).order_by("id")
+
+
+def concluir(token: str, resultados: Iterable[Dict[str, Any]]) -> Dict[str, List[int]]:
+    """
+    Grava o resultado do reprocessamento e encerra a reserva.
+    Cada resultado: {"id", "cod_patrimonio"?, "ocr_raw"?}. Sem cod_patrimonio
+    (ou ainda PEND), conta como falha: o registro volta para a fila com
+    backoff. Ids que não estão reservados com esse token (reserva vencida e
+    pega por outro worker, por exemplo) são rejeitados.
+    """
+    resultados = {int(r["id"]): r for r in resultados}
+    concluidos, liberados, rejeitados = [], [], []
+    agora = now()
+
+    # toda operação começa por escrita filtrada pelo token: nada de
+    # ler-depois-escrever na mesma transação (ver reservar)
+    with transaction.atomic():
+        for pk in sorted(resultados):
+            r = resultados[pk]
+            reservado = Patrimonio.objects.filter(id=pk, reserva_token=token)
+            cod = r.get("cod_patrimonio")
+
+            if cod and not eh_pendente(cod):
+                # update direto: save() não roda, então cod_normalizado vai aqui
+                campos = {
+                    "cod_patrimonio": cod,
+                    "cod_normalizado": normalizar_codigo(cod),
+                    "processado_em": agora,
+                    "atualizado_em": agora,
+                    "proxima_tentativa": None,
+                    "reserva_token": "",
+                }
+                if "ocr_raw" in r:
+                    campos["ocr_raw"] = r["ocr_raw"] or ""
+                if reservado.update(**campos):
+                    concluidos.append(pk)
+                else:
+                    rejeitados.append(pk)
+                continue
+
+            if not reservado.update(tentativas=F("tentativas") + 1, reserva_token="", atualizado_em=agora):
+                rejeitados.append(pk)
+                continue
+            obj = Patrimonio.objects.filter(id=pk)
+            tentativas = obj.values_list("tentativas", flat=True).get()
+            obj.update(proxima_tentativa=agora + backoff(tentativas))
+            liberados.append(pk)
+
+    return {"concluidos": concluidos, "liberados": liberados, "rejeitados": rejeitados}
+
+
+def status() -> Dict[str, int]:
+    agora = now()
+    pendentes = Patrimonio.objects.filter(pendente=True)
+    return {
+        "pendentes": pendentes.count(),
+        "disponiveis": _livres(agora).count(),
+        "reservados": pendentes.exclude(reserva_token="").filter(proxima_tentativa__gte=agora).count(),
+        "estacionados": pendentes.filter(tentativas__gte=MAX_TENTATIVAS).count(),
+    }
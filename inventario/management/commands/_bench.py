@@ -0,0 +1,54 @@
+# inventario/management/commands/_bench.py
+"""
+Utilitários compartilhados pelos comandos bench_* (não é um comando).
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.utils.timezone import now
+
+from inventario.models import Patrimonio
+
+PREFIXO = "bench-"
+
+
+def criar_sinteticos(n: int, prefixo: str = PREFIXO, batch_size: int = 2000) -> None:
+    """
+    Insere n registros sintéticos (checklist começando com `prefixo`).
+    """
+    agora = now()
+    Patrimonio.objects.bulk_create(
+        (
+            Patrimonio(
+                cod_patrimonio=f"BENCH{i:08d}",
+                data=agora.date(),
+                checklist=f"{prefixo}{i}",
+                localizacao="Depósito Central",
+                filial="Filial Bench",
+                dropbox_link=f"https://www.dropbox.com/s/bench/{i}.jpg",
+                ocr_raw=f"PATRIMÔNIO BENCH{i:08d}\nlinha 2 do OCR",
+                coords_lat=Decimal("-23.550520"),
+                coords_lon=Decimal("-46.633308"),
+                coords_raw="-23.550520,-46.633308",
+                arquivo=f"IMG_{i}.jpg",
+                dropbox_path=f"/checklists/bench/IMG_{i}.jpg",
+                content_hash=f"{i:064x}",
+                client_modified=agora - timedelta(minutes=i),
+                processado_em=agora - timedelta(hours=i % (24 * 14)),
+            )
+            for i in range(n)
+        ),
+        batch_size=batch_size,
+    )
+
+
+def apagar_sinteticos(prefixo: str = PREFIXO) -> int:
+    apagados, _ = Patrimonio.objects.filter(checklist__startswith=prefixo).delete()
+    return apagados
+
+
+def percentil(valores, p: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
@@ -0,0 +1,151 @@
+# inventario/management/commands/bench_asgi.py
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connections
+from django.test import AsyncClient, Client
+
+from inventario.management.commands._bench import apagar_sinteticos, criar_sinteticos, percentil
+
+import sys
+try:
+    sys.stdout.reconfigure(encoding="utf-8")
+    sys.stderr.reconfigure(encoding="utf-8")
+except Exception:
+    pass
+
+# rota síncrona (WSGI) -> rota assíncrona (ASGI) equivalente
+ROTAS = {
+    "overview": ("/api/metrics/overview/", "/api/async/metrics/overview/"),
+    "timeseries": ("/api/metrics/timeseries/", "/api/async/metrics/timeseries/"),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Teste de carga em processo: N clientes simultâneos contra as rotas WSGI "
+        "(pool fixo de threads, como um worker gthread) e ASGI (event loop), no mesmo banco."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rota",
+            choices=list(ROTAS),
+            default="overview",
+            help="Endpoint a testar (padrão: overview).",
+        )
+        parser.add_argument(
+            "--clientes",
+            type=int,
+            default=200,
+            help="Clientes simultâneos (padrão: 200).",
+        )
+        parser.add_argument(
+            "--requisicoes",
+            type=int,
+            default=2000,
+            help="Total de requisições por modo (padrão: 2000).",
+        )
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=8,
+            help="Threads do worker WSGI (padrão: 8).",
+        )
+        parser.add_argument(
+            "--sinteticos",
+            type=int,
+            default=0,
+            help="Insere N registros sintéticos antes e apaga ao final.",
+        )
+
+    # ----------------- Modos -----------------
+
+    async def _clientes(self, fazer, clientes: int, total: int):
+        """
+        Dispara `total` requisições com no máximo `clientes` em voo;
+        devolve (duração, latências, erros).
+        """
+        sem = asyncio.Semaphore(clientes)
+        latencias, erros = [], 0
+
+        async def um():
+            nonlocal erros
+            async with sem:
+                t0 = time.perf_counter()
+                status = await fazer()
+                latencias.append(time.perf_counter() - t0)
+                if status != 200:
+                    erros += 1
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(um() for _ in range(total)))
+        return time.perf_counter() - t0, latencias, erros
+
+    def _wsgi(self, url: str, clientes: int, total: int, threads: int):
+        local = threading.local()
+
+        def get():
+            client = getattr(local, "client", None)
+            if client is None:
+                client = local.client = Client()
+            try:
+                return client.get(url).status_code
+            finally:
+                close_old_connections()
+
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            async def fazer():
+                return await asyncio.get_running_loop().run_in_executor(pool, get)
+            return asyncio.run(self._clientes(fazer, clientes, total))
+
+    def _asgi(self, url: str, clientes: int, total: int):
+        async def rodar():
+            client = AsyncClient()
+
+            async def fazer():
+                return (await client.get(url)).status_code
+            return await self._clientes(fazer, clientes, total)
+        return asyncio.run(rodar())
+
+    # ----------------- Handle -----------------
+
+    def _linha(self, nome, duracao, latencias, erros, total):
+        self.stdout.write(
+            f"{nome:<5} {total / duracao:9.1f} req/s   "
+            f"p50 {percentil(latencias, 50) * 1000:8.1f} ms   "
+            f"p95 {percentil(latencias, 95) * 1000:8.1f} ms   "
+            f"erros {erros}"
+        )
+
+    def handle(self, *args, **options):
+        if "testserver" not in settings.ALLOWED_HOSTS and "*" not in settings.ALLOWED_HOSTS:
+            settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, "testserver"]
+        if connections["default"].vendor == "sqlite" and ":memory:" in str(connections["default"].settings_dict["NAME"]):
+            raise CommandError("Use um banco em arquivo: o teste abre uma conexão por thread.")
+
+        url_wsgi, url_asgi = ROTAS[options["rota"]]
+        clientes, total = options["clientes"], options["requisicoes"]
+        n = options["sinteticos"]
+
+        if n:
+            criar_sinteticos(n)
+        try:
+            # aquecimento (imports, caches, páginas do SQLite)
+            Client().get(url_wsgi)
+            wsgi = self._wsgi(url_wsgi, clientes, total, options["threads"])
+            asgi = self._asgi(url_asgi, clientes, total)
+        finally:
+            if n:
+                apagar_sinteticos()
+
+        self.stdout.write(self.style.NOTICE("===== BENCH WSGI x ASGI ====="))
+        self.stdout.write(f"Rota:        {options['rota']}  ({url_wsgi} x {url_asgi})")
+        self.stdout.write(f"Clientes:    {clientes}   requisições: {total}   threads WSGI: {options['threads']}")
+        self._linha("WSGI", *wsgi, total)
+        self._linha("ASGI", *asgi, total)
+        self.stdout.write(self.style.NOTICE("============================="))
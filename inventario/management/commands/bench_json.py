@@ -0,0 +1,106 @@
+# inventario/management/commands/bench_json.py
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from inventario import fastjson
+from inventario.models import Patrimonio
+from inventario.management.commands._bench import criar_sinteticos
+from inventario.renderers import FastJSONRenderer
+from inventario.serializers import PatrimonioSerializer, serializar_valores
+
+import sys
+try:
+    sys.stdout.reconfigure(encoding="utf-8")
+    sys.stderr.reconfigure(encoding="utf-8")
+except Exception:
+    pass
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark da listagem: PatrimonioSerializer + JSONRenderer vs. "
+        "values_list() + FastJSONRenderer, e json.loads vs. fastjson.loads."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--pagina",
+            type=int,
+            default=10000,
+            help="Quantidade de registros por página (padrão: 10000).",
+        )
+        parser.add_argument(
+            "--repeticoes",
+            type=int,
+            default=5,
+            help="Repetições de cada caminho; vale o melhor tempo (padrão: 5).",
+        )
+        parser.add_argument(
+            "--sinteticos",
+            type=int,
+            default=0,
+            help="Cria N registros sintéticos numa transação desfeita ao final.",
+        )
+
+    def _melhor(self, fn, repeticoes: int):
+        melhor = None
+        resultado = None
+        for _ in range(repeticoes):
+            t0 = time.perf_counter()
+            resultado = fn()
+            dt = time.perf_counter() - t0
+            melhor = dt if melhor is None else min(melhor, dt)
+        return melhor, resultado
+
+    def _rodar(self, pagina: int, repeticoes: int):
+        qs = Patrimonio.objects.all().order_by("-id")[:pagina]
+        renderer, fast_renderer = JSONRenderer(), FastJSONRenderer()
+
+        def padrao():
+            return renderer.render(PatrimonioSerializer(qs, many=True).data)
+
+        def rapido():
+            return fast_renderer.render(serializar_valores(qs))
+
+        t_padrao, body_padrao = self._melhor(padrao, repeticoes)
+        t_rapido, body_rapido = self._melhor(rapido, repeticoes)
+        t_loads, _ = self._melhor(lambda: json.loads(body_padrao), repeticoes)
+        t_fast_loads, _ = self._melhor(lambda: fastjson.loads(body_padrao), repeticoes)
+
+        iguais = json.loads(body_padrao) == json.loads(body_rapido)
+        n = len(json.loads(body_rapido))
+
+        self.stdout.write(self.style.NOTICE("===== BENCH JSON ====="))
+        self.stdout.write(f"Registros:        {n}")
+        self.stdout.write(f"Backend JSON:     {'orjson' if fastjson.orjson else 'json (stdlib)'}")
+        self.stdout.write(f"Serializer+JSON:  {t_padrao * 1000:9.1f} ms")
+        self.stdout.write(f"values()+fast:    {t_rapido * 1000:9.1f} ms  ({t_padrao / t_rapido:.1f}x)")
+        self.stdout.write(f"json.loads:       {t_loads * 1000:9.1f} ms")
+        self.stdout.write(f"fastjson.loads:   {t_fast_loads * 1000:9.1f} ms  ({t_loads / t_fast_loads:.1f}x)")
+        self.stdout.write(f"Saídas iguais:    {'sim' if iguais else 'NÃO'}")
+        self.stdout.write(self.style.NOTICE("======================"))
+
+    def handle(self, *args, **options):
+        pagina = options["pagina"]
+        repeticoes = max(1, options["repeticoes"])
+        n = options["sinteticos"]
+
+        if not n:
+            self._rodar(pagina, repeticoes)
+            return
+
+        try:
+            with transaction.atomic():
+                criar_sinteticos(n)
+                self._rodar(pagina, repeticoes)
+                raise _Rollback
+        except _Rollback:
+            pass
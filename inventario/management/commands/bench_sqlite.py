@@ -0,0 +1,178 @@
+# inventario/management/commands/bench_sqlite.py
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connections
+from django.test import Client
+
+from inventario.management.commands._bench import apagar_sinteticos, percentil
+
+try:
+    sys.stdout.reconfigure(encoding="utf-8")
+    sys.stderr.reconfigure(encoding="utf-8")
+except Exception:
+    pass
+
+PREFIXO = "bench-imp-"
+
+
+class Command(BaseCommand):
+    help = (
+        "Importação concorrente com leitores do dashboard. Com --comparar, roda em "
+        "cópias do banco com DJANGO_DB_PROFILE=dev e =prod e mostra lado a lado."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--registros",
+            type=int,
+            default=20000,
+            help="Registros no JSON importado (padrão: 20000).",
+        )
+        parser.add_argument(
+            "--leitores",
+            type=int,
+            default=4,
+            help="Threads consultando /api/metrics/overview/ durante a importação (padrão: 4).",
+        )
+        parser.add_argument(
+            "--comparar",
+            action="store_true",
+            help="Roda os dois perfis em subprocessos, cada um numa cópia do banco atual.",
+        )
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            help="Imprime o resultado como JSON (usado pelo --comparar).",
+        )
+
+    # ----------------- Carga -----------------
+
+    def _arquivo_importacao(self, n: int, pasta: str) -> Path:
+        path = Path(pasta) / "bench_import.json"
+        records = [
+            {
+                "checklist": f"{PREFIXO}{i}",
+                "cod_patrimonio": f"IMP{i:08d}" if i % 10 else f"PEND-{i}",
+                "filial": "Filial Bench",
+                "localizacao": "Depósito Central",
+                "coords_raw": "-23.550520,-46.633308",
+                "lat": "-23.550520",
+                "lon": "-46.633308",
+                "content_hash": f"{i:064x}",
+                "processado_em": "2025-10-17T12:00:00Z",
+            }
+            for i in range(n)
+        ]
+        path.write_text(json.dumps({"records": records}), encoding="utf-8")
+        return path
+
+    def _rodar(self, n: int, leitores: int) -> dict:
+        fim = threading.Event()
+        latencias, erros = [], [0]
+        lock = threading.Lock()
+
+        def leitor():
+            client = Client(raise_request_exception=False)
+            while not fim.is_set():
+                t0 = time.perf_counter()
+                status = client.get("/api/metrics/overview/").status_code
+                dt = time.perf_counter() - t0
+                with lock:
+                    latencias.append(dt)
+                    if status != 200:
+                        erros[0] += 1
+            close_old_connections()
+
+        with tempfile.TemporaryDirectory() as pasta:
+            arquivo = self._arquivo_importacao(n, pasta)
+            threads = [threading.Thread(target=leitor) for _ in range(leitores)]
+            for t in threads:
+                t.start()
+            t0 = time.perf_counter()
+            erro_import = None
+            try:
+                with open(os.devnull, "w") as devnull:
+                    call_command("importar_patrimonios", arquivo=str(arquivo), quiet=True, stdout=devnull)
+            except CommandError as e:
+                erro_import = str(e)
+            duracao = time.perf_counter() - t0
+            fim.set()
+            for t in threads:
+                t.join()
+
+        apagar_sinteticos(PREFIXO)
+        with connections["default"].cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            journal = cursor.fetchone()[0]
+
+        return {
+            "perfil": settings.DB_PROFILE,
+            "journal": journal,
+            "importacao_s": round(duracao, 2),
+            "importacao_rps": round(n / duracao, 1),
+            "erro_importacao": erro_import,
+            "leituras": len(latencias),
+            "leituras_rps": round(len(latencias) / duracao, 1),
+            "leituras_p50_ms": round(percentil(latencias, 50) * 1000, 1),
+            "leituras_p95_ms": round(percentil(latencias, 95) * 1000, 1),
+            "leituras_erros": erros[0],
+        }
+
+    def _comparar(self, options) -> list:
+        origem = Path(settings.DATABASES["default"]["NAME"])
+        resultados = []
+        with tempfile.TemporaryDirectory() as pasta:
+            for perfil in ("dev", "prod"):
+                copia = Path(pasta) / f"{perfil}.sqlite3"
+                # backup API: copia consistente mesmo com a origem em WAL
+                with sqlite3.connect(origem) as src, sqlite3.connect(copia) as dst:
+                    src.backup(dst)
+                    dst.execute("PRAGMA journal_mode=DELETE")
+                env = dict(os.environ, DJANGO_DB_PROFILE=perfil, DJANGO_SQLITE_PATH=str(copia))
+                proc = subprocess.run(
+                    [sys.executable, str(settings.BASE_DIR / "manage.py"), "bench_sqlite", "--json",
+                     "--registros", str(options["registros"]), "--leitores", str(options["leitores"])],
+                    env=env, capture_output=True, text=True,
+                )
+                if proc.returncode:
+                    raise CommandError(f"Falha no perfil {perfil}:\n{proc.stderr}")
+                resultados.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+        return resultados
+
+    # ----------------- Handle -----------------
+
+    def handle(self, *args, **options):
+        if "testserver" not in settings.ALLOWED_HOSTS and "*" not in settings.ALLOWED_HOSTS:
+            settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, "testserver"]
+
+        if options["comparar"]:
+            resultados = self._comparar(options)
+        else:
+            resultados = [self._rodar(options["registros"], options["leitores"])]
+            if options["json"]:
+                self.stdout.write(json.dumps(resultados[0]))
+                return
+
+        self.stdout.write(self.style.NOTICE("===== BENCH SQLITE (importação + dashboard) ====="))
+        self.stdout.write(f"Registros: {options['registros']}   leitores: {options['leitores']}")
+        for r in resultados:
+            self.stdout.write(
+                f"{r['perfil']:<5} journal={r['journal']:<7} "
+                f"importação {r['importacao_s']:7.2f} s ({r['importacao_rps']:.0f} reg/s)   "
+                f"dashboard {r['leituras_rps']:7.1f} req/s  p50 {r['leituras_p50_ms']:.1f} ms  "
+                f"p95 {r['leituras_p95_ms']:.1f} ms  erros {r['leituras_erros']}"
+            )
+            if r["erro_importacao"]:
+                self.stdout.write(self.style.ERROR(f"      importação: {r['erro_importacao']}"))
+        self.stdout.write(self.style.NOTICE("================================================="))
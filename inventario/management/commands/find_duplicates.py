@@ -0,0 +1,73 @@
+# inventario/management/commands/find_duplicates.py
+import json
+
+from django.core.management.base import BaseCommand
+
+from inventario.duplicados import CRITERIOS, iter_grupos
+
+import sys
+try:
+    sys.stdout.reconfigure(encoding="utf-8")
+    sys.stderr.reconfigure(encoding="utf-8")
+except Exception:
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Lista grupos de possíveis duplicados (mesmo content_hash ou mesmo código normalizado) "
+        "em uma única passada ordenada pela tabela."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--criterio",
+            choices=[*CRITERIOS, "todos"],
+            default="todos",
+            help="hash, codigo ou todos (padrão).",
+        )
+        parser.add_argument(
+            "--min",
+            type=int,
+            default=2,
+            help="Tamanho mínimo do grupo (padrão: 2).",
+        )
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            help="Saída em JSON Lines (um grupo por linha).",
+        )
+        parser.add_argument(
+            "--quiet",
+            action="store_true",
+            help="Só imprime o resumo.",
+        )
+
+    def handle(self, *args, **options):
+        criterios = list(CRITERIOS) if options["criterio"] == "todos" else [options["criterio"]]
+        as_json = options["json"]
+        quiet = options["quiet"]
+
+        resumo = {}
+        for criterio in criterios:
+            grupos = registros = 0
+            for grupo in iter_grupos(criterio, min_tamanho=options["min"]):
+                grupos += 1
+                registros += grupo["total"]
+                if quiet:
+                    continue
+                if as_json:
+                    self.stdout.write(json.dumps(grupo, ensure_ascii=False))
+                else:
+                    ids = ", ".join(str(r["id"]) for r in grupo["registros"])
+                    self.stdout.write(f"[{criterio}] {grupo['chave']} ({grupo['total']}): ids={ids}")
+            resumo[criterio] = (grupos, registros)
+
+        if as_json and not quiet:
+            return
+
+        self.stdout.write("")
+        self.stdout.write(self.style.NOTICE("===== DUPLICADOS ====="))
+        for criterio, (grupos, registros) in resumo.items():
+            self.stdout.write(f"{criterio:<8} grupos: {grupos:<8} registros: {registros}")
+        self.stdout.write(self.style.NOTICE("======================"))
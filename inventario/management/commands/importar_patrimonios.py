@@ -1,5 +1,4 @@
 # inventario/management/commands/importar_patrimonios.py
-import json
 from pathlib import Path
 from typing import Any, Dict, Iterable, Tuple
 from decimal import Decimal, InvalidOperation
@@ -7,6 +6,7 @@ from datetime import datetime
 
 from django.core.management.base import BaseCommand, CommandError
 from django.db import IntegrityError, transaction
+from inventario import fastjson
 from inventario.models import Patrimonio
 
 import sys
@@ -155,8 +155,8 @@ class Command(BaseCommand):
             raise CommandError(f"Arquivo não encontrado: {path}")
 
         try:
-            payload = json.loads(path.read_text(encoding="utf-8"))
-        except json.JSONDecodeError as e:
+            payload = fastjson.loads(path.read_bytes())
+        except ValueError as e:  # JSONDecodeError, NaN/Infinity, UTF-8 inválido
             raise CommandError(f"JSON inválido em {path}: {e}")
 
         dry = options["dry_run"]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:27
+
+import re
+
+from django.db import migrations, models
+
+# cópia de inventario.models.normalizar_codigo na época desta migração
+# (migrações não devem depender do código atual do app)
+_OCR_TROCAS = str.maketrans({
+    "O": "0", "Q": "0", "D": "0", "I": "1", "L": "1", "S": "5", "B": "8", "Z": "2", "G": "6",
+})
+_CONFUNDIVEIS = frozenset("OQDILSBZG")
+_NAO_ALFANUM = re.compile(r"[^0-9A-Z]")
+_PREFIXO = re.compile(r"[A-Z]*")
+
+
+def normalizar_codigo(cod):
+    if not cod:
+        return ""
+    s = _NAO_ALFANUM.sub("", str(cod).upper())
+    if not s or s.startswith("PEND"):
+        return ""
+    prefixo = _PREFIXO.match(s).group()
+    numero = s[len(prefixo):]
+    if not numero:
+        return s
+    corte = len(prefixo)
+    while corte > 1 and prefixo[corte - 1] in _CONFUNDIVEIS:
+        corte -= 1
+    return prefixo[:corte] + (prefixo[corte:] + numero).translate(_OCR_TROCAS)
+
+
+def preencher_cod_normalizado(apps, schema_editor):
+    Patrimonio = apps.get_model("inventario", "Patrimonio")
+    lote = []
+    for obj in Patrimonio.objects.only("id", "cod_patrimonio").iterator(chunk_size=2000):
+        obj.cod_normalizado = normalizar_codigo(obj.cod_patrimonio)
+        lote.append(obj)
+        if len(lote) >= 2000:
+            Patrimonio.objects.bulk_update(lote, ["cod_normalizado"])
+            lote = []
+    if lote:
+        Patrimonio.objects.bulk_update(lote, ["cod_normalizado"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0004_patrimonio_coords_lat_patrimonio_coords_lon_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='patrimonio',
+            name='cod_normalizado',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='patrimonio',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=128),
+        ),
+        migrations.RunPython(preencher_cod_normalizado, migrations.RunPython.noop),
+    ]
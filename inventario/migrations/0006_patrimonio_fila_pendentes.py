@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0005_patrimonio_cod_normalizado_indices'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='patrimonio',
+            name='pendente',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(cod_patrimonio__istartswith='PEND', then=models.Value(True)), default=models.Value(False)), output_field=models.BooleanField()),
+        ),
+        migrations.AddField(
+            model_name='patrimonio',
+            name='proxima_tentativa',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='patrimonio',
+            name='reserva_token',
+            field=models.CharField(blank=True, editable=False, max_length=32),
+        ),
+        migrations.AddField(
+            model_name='patrimonio',
+            name='tentativas',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='patrimonio',
+            index=models.Index(condition=models.Q(('pendente', True)), fields=['proxima_tentativa', 'id'], name='patrimonio_pendente_fila_idx'),
+        ),
+    ]
@@ -1,5 +1,47 @@
+import re
+
 from django.db import models
 
+# troca de caracteres que o OCR costuma confundir em códigos numéricos
+_OCR_TROCAS = str.maketrans({
+    "O": "0", "Q": "0", "D": "0", "I": "1", "L": "1", "S": "5", "B": "8", "Z": "2", "G": "6",
+})
+_CONFUNDIVEIS = frozenset("OQDILSBZG")
+_NAO_ALFANUM = re.compile(r"[^0-9A-Z]")
+_PREFIXO = re.compile(r"[A-Z]*")
+
+
+def normalizar_codigo(cod):
+    """
+    Chave de comparação para cod_patrimonio: maiúsculas, sem separadores,
+    com as trocas típicas de OCR aplicadas só na parte numérica (o prefixo
+    alfabético, ex. TECG/TPTA, fica como está). Letras confundíveis no fim
+    do prefixo, coladas nos dígitos, contam como parte numérica
+    (TECG-1197 ~ TEC61197), mas o prefixo mantém ao menos uma letra.
+    Códigos PEND (não lidos) viram "".
+    """
+    if not cod:
+        return ""
+    s = _NAO_ALFANUM.sub("", str(cod).upper())
+    if not s or s.startswith("PEND"):
+        return ""
+    prefixo = _PREFIXO.match(s).group()
+    numero = s[len(prefixo):]
+    if not numero:
+        return s
+    corte = len(prefixo)
+    while corte > 1 and prefixo[corte - 1] in _CONFUNDIVEIS:
+        corte -= 1
+    return prefixo[:corte] + (prefixo[corte:] + numero).translate(_OCR_TROCAS)
+
+
+def eh_pendente(cod):
+    """
+    Registro ainda sem patrimônio lido (cod_patrimonio começando com PEND).
+    """
+    return bool(cod) and str(cod).upper().startswith("PEND")
+
+
 class Patrimonio(models.Model):
     cod_patrimonio = models.CharField(max_length=100, unique=False, null=True, blank=True)
 
@@ -21,11 +63,44 @@ class Patrimonio(models.Model):
     # extras
     arquivo = models.CharField(max_length=255, blank=True)
     dropbox_path = models.CharField(max_length=500, blank=True)
-    content_hash = models.CharField(max_length=128, blank=True)
+    content_hash = models.CharField(max_length=128, blank=True, db_index=True)
+    cod_normalizado = models.CharField(max_length=100, blank=True, db_index=True, editable=False)
+
+    # fila de reprocessamento (PEND). "pendente" é calculado pelo banco,
+    # então update()/bulk_create/SQL direto não o deixam divergir do código.
+    pendente = models.GeneratedField(
+        expression=models.Case(
+            models.When(cod_patrimonio__istartswith="PEND", then=models.Value(True)),
+            default=models.Value(False),
+        ),
+        output_field=models.BooleanField(),
+        db_persist=True,
+    )
+    # quando o registro pode ser entregue de novo (fim da reserva ou do backoff)
+    proxima_tentativa = models.DateTimeField(null=True, blank=True, editable=False)
+    tentativas = models.PositiveIntegerField(default=0, editable=False)
+    reserva_token = models.CharField(max_length=32, blank=True, editable=False)
     client_modified = models.DateTimeField(null=True, blank=True)
     processado_em = models.DateTimeField(null=True, blank=True)
     criado_em = models.DateTimeField(auto_now_add=True)
     atualizado_em = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # índice parcial: só as linhas PEND, na ordem em que a fila as entrega
+            models.Index(
+                fields=["proxima_tentativa", "id"],
+                condition=models.Q(pendente=True),
+                name="patrimonio_pendente_fila_idx",
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.cod_normalizado = normalizar_codigo(self.cod_patrimonio)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "cod_patrimonio" in update_fields:
+            kwargs["update_fields"] = set(update_fields) | {"cod_normalizado"}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.cod_patrimonio or "<sem patrimônio>"
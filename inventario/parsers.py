@@ -0,0 +1,23 @@
+# inventario/parsers.py
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from . import fastjson
+
+
+class FastJSONParser(JSONParser):
+    """
+    JSONParser que usa fastjson (orjson quando disponível).
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        try:
+            raw = stream.read()
+            if encoding.lower().replace("-", "") != "utf8":
+                raw = raw.decode(encoding)
+            return fastjson.loads(raw)
+        except (ValueError, UnicodeDecodeError) as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
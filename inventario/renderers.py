@@ -0,0 +1,23 @@
+# inventario/renderers.py
+from rest_framework.renderers import JSONRenderer
+
+from . import fastjson
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer que usa fastjson (orjson quando disponível).
+    Pedidos com indentação (ex.: BrowsableAPI) seguem pelo renderer padrão.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = fastjson.dumps(data)
+        # mesmo escape do JSONRenderer para \u2028/\u2029
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
@@ -0,0 +1,63 @@
+# inventario/routers.py
+"""
+Roteamento de leituras para o alias "leitura" (perfil prod do SQLite).
+Só as views marcadas com @somente_leitura usam esse alias; o resto
+(admin, importação, escrita da API) continua no "default".
+"""
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction
+from django.db import connections
+
+ALIAS_LEITURA = "leitura"
+
+# ContextVar: vale por requisição e acompanha o sync_to_async das views assíncronas
+_leitura = ContextVar("inventario_somente_leitura", default=False)
+
+
+@contextmanager
+def leitura():
+    token = _leitura.set(True)
+    try:
+        yield
+    finally:
+        _leitura.reset(token)
+
+
+def somente_leitura(view):
+    """
+    Decorator: as consultas feitas dentro da view vão para o alias "leitura".
+    Funciona em views síncronas e assíncronas.
+    """
+    if iscoroutinefunction(view):
+        @functools.wraps(view)
+        async def wrapper(*args, **kwargs):
+            with leitura():
+                return await view(*args, **kwargs)
+    else:
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            with leitura():
+                return view(*args, **kwargs)
+    return wrapper
+
+
+class LeituraRouter:
+    def db_for_read(self, model, **hints):
+        if _leitura.get() and ALIAS_LEITURA in connections.settings:
+            return ALIAS_LEITURA
+        return None
+
+    def db_for_write(self, model, **hints):
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # mesma base física do default: migra só por lá
+        if db == ALIAS_LEITURA:
+            return False
+        return None
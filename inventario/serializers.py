@@ -1,8 +1,78 @@
 # inventario/serializers.py
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
 from rest_framework import serializers
 from .models import Patrimonio            # <-- ADICIONE
 
 class PatrimonioSerializer(serializers.ModelSerializer):
     class Meta:
         model = Patrimonio
-        fields = "__all__"
+        exclude = ("reserva_token",)
+
+
+def _valor_decimal(v):
+    return None if v is None else format(v, "f")
+
+
+def _valor_date(v):
+    return None if v is None else v.isoformat()
+
+
+def _valor_datetime():
+    """
+    Equivalente ao DateTimeField.to_representation do DRF (fuso atual,
+    sufixo 'Z' para UTC), com o fuso resolvido uma vez por listagem.
+    """
+    tz = timezone.get_current_timezone() if settings.USE_TZ else None
+    if tz is not None and timezone.get_current_timezone_name() == "UTC":
+        tz = None  # o banco já devolve em UTC
+
+    def conv(v):
+        if v is None:
+            return None
+        if tz is not None and v.tzinfo is not None:
+            v = v.astimezone(tz)
+        s = v.isoformat()
+        return s[:-6] + "Z" if s.endswith("+00:00") else s
+    return conv
+
+
+def _conversores(model, campos):
+    """
+    Para cada campo, a conversão que o ModelSerializer aplicaria
+    (ou None quando o valor do banco já sai pronto para JSON).
+    """
+    conv_datetime = _valor_datetime()
+    conv = []
+    for nome in campos:
+        f = model._meta.get_field(nome)
+        if isinstance(f, models.DecimalField):
+            conv.append(_valor_decimal)
+        elif isinstance(f, models.DateTimeField):
+            conv.append(conv_datetime)
+        elif isinstance(f, models.DateField):
+            conv.append(_valor_date)
+        else:
+            conv.append(None)
+    return conv
+
+
+def serializar_valores(queryset, campos=None):
+    """
+    Caminho rápido para listagens somente leitura: lê tuplas via
+    values_list() e monta os dicts direto, sem instanciar o model nem
+    passar pelo PatrimonioSerializer. Mesma saída do serializer.
+    """
+    if campos is None:
+        campos = PatrimonioSerializer().fields.keys()
+    campos = list(campos)
+    conv = _conversores(queryset.model, campos)
+    pares = list(zip(campos, conv))
+    out = []
+    for row in queryset.values_list(*campos).iterator(chunk_size=2000):
+        out.append({
+            nome: (c(v) if c is not None else v)
+            for (nome, c), v in zip(pares, row)
+        })
+    return out
@@ -1,3 +1,660 @@
-from django.test import TestCase
+import importlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+import unittest
+from contextlib import contextmanager
+from datetime import date, datetime, timezone as dt_timezone
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, iscoroutinefunction, sync_to_async
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, connections
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import make_aware, now
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from . import fastjson, fila
+from .duplicados import iter_grupos
+from .models import Patrimonio, normalizar_codigo
+from .parsers import FastJSONParser
+from .renderers import FastJSONRenderer
+from .routers import ALIAS_LEITURA, LeituraRouter, leitura, somente_leitura
+from .serializers import PatrimonioSerializer, serializar_valores
+
+
+class NormalizarCodigoTests(TestCase):
+    def test_maiusculas_e_separadores(self):
+        self.assertEqual(normalizar_codigo(" tpta-00123 "), "TPTA00123")
+        self.assertEqual(normalizar_codigo("TPTA 001.23"), "TPTA00123")
+
+    def test_trocas_so_na_parte_numerica(self):
+        self.assertEqual(normalizar_codigo("QTA0002O"), "QTA00020")
+        self.assertEqual(normalizar_codigo("TPTA0OI23"), "TPTA00123")
+        # prefixo alfabético não vira dígito
+        self.assertEqual(normalizar_codigo("BLOQ"), "BLOQ")
+        self.assertNotEqual(normalizar_codigo("BLOQ-10"), normalizar_codigo("8100-10"))
+
+    def test_letra_confundivel_colada_nos_digitos(self):
+        self.assertEqual(normalizar_codigo("TECG-1197"), normalizar_codigo("TEC61197"))
+        self.assertEqual(normalizar_codigo("TBRG00S12"), normalizar_codigo("TBR600512"))
+
+    def test_vazios_e_pend(self):
+        self.assertEqual(normalizar_codigo(None), "")
+        self.assertEqual(normalizar_codigo(""), "")
+        self.assertEqual(normalizar_codigo("--"), "")
+        self.assertEqual(normalizar_codigo("PEND-7ae72ce3"), "")
+        self.assertEqual(normalizar_codigo("pend-7ae72ce3"), "")
+
+    def test_save_preenche_cod_normalizado(self):
+        obj = Patrimonio.objects.create(checklist="c1", cod_patrimonio="TECG-1197")
+        self.assertEqual(obj.cod_normalizado, "TEC61197")
+        obj.cod_patrimonio = "QTA0002O"
+        obj.save(update_fields=["cod_patrimonio"])
+        obj.refresh_from_db()
+        self.assertEqual(obj.cod_normalizado, "QTA00020")
+
+
+class IterGruposTests(TestCase):
+    def setUp(self):
+        self.a = Patrimonio.objects.create(checklist="c1", cod_patrimonio="TECG-1197", content_hash="h1")
+        self.b = Patrimonio.objects.create(checklist="c2", cod_patrimonio="TEC61197", content_hash="h2")
+        self.c = Patrimonio.objects.create(checklist="c3", cod_patrimonio="TPTA00123", content_hash="h1")
+        self.d = Patrimonio.objects.create(checklist="c4", cod_patrimonio="PEND-1", content_hash="")
+        self.e = Patrimonio.objects.create(checklist="c5", cod_patrimonio="PEND-2", content_hash="")
+
+    def test_grupos_por_codigo(self):
+        grupos = list(iter_grupos("codigo"))
+        self.assertEqual(len(grupos), 1)
+        self.assertEqual(grupos[0]["chave"], "TEC61197")
+        self.assertEqual([r["id"] for r in grupos[0]["registros"]], [self.a.pk, self.b.pk])
+
+    def test_grupos_por_hash_ignora_vazios(self):
+        grupos = list(iter_grupos("hash"))
+        self.assertEqual(len(grupos), 1)
+        self.assertEqual(grupos[0]["chave"], "h1")
+        self.assertEqual(grupos[0]["total"], 2)
+        self.assertEqual([r["id"] for r in grupos[0]["registros"]], [self.a.pk, self.c.pk])
+
+    def test_min_tamanho(self):
+        self.assertEqual(list(iter_grupos("codigo", min_tamanho=3)), [])
+        self.assertEqual(len(list(iter_grupos("codigo", min_tamanho=1))), 2)
+
+
+class FindDuplicatesCommandTests(TestCase):
+    def setUp(self):
+        self.a = Patrimonio.objects.create(checklist="c1", cod_patrimonio="TECG-1197", content_hash="h1")
+        self.b = Patrimonio.objects.create(checklist="c2", cod_patrimonio="TEC61197", content_hash="h1")
+        self.c = Patrimonio.objects.create(checklist="c3", cod_patrimonio="TEC-61197", content_hash="h2")
+
+    def _rodar(self, **options):
+        out = StringIO()
+        call_command("find_duplicates", stdout=out, **options)
+        return out.getvalue()
+
+    def test_texto_com_resumo(self):
+        out = self._rodar(criterio="hash")
+        self.assertIn(f"[hash] h1 (2): ids={self.a.pk}, {self.b.pk}", out)
+        self.assertIn("hash     grupos: 1        registros: 2", out)
+        self.assertNotIn("codigo", out)
+
+    def test_todos_e_min(self):
+        out = self._rodar(min=3)
+        self.assertIn(f"[codigo] TEC61197 (3): ids={self.a.pk}, {self.b.pk}, {self.c.pk}", out)
+        self.assertIn("hash     grupos: 0        registros: 0", out)
+        self.assertIn("codigo   grupos: 1        registros: 3", out)
+
+    def test_json_lines_sem_resumo(self):
+        linhas = self._rodar(json=True).splitlines()
+        grupos = [json.loads(linha) for linha in linhas]
+        self.assertEqual([(g["criterio"], g["chave"], g["total"]) for g in grupos],
+                         [("hash", "h1", 2), ("codigo", "TEC61197", 3)])
+
+    def test_quiet_so_resumo(self):
+        out = self._rodar(quiet=True)
+        self.assertNotIn("[hash]", out)
+        self.assertNotIn("[codigo]", out)
+        self.assertIn("codigo   grupos: 1        registros: 3", out)
+        # --json --quiet imprime só o resumo, em texto
+        self.assertEqual(self._rodar(json=True, quiet=True), out)
+
+
+class DuplicadosApiTests(TransactionTestCase):
+    # com DJANGO_DB_PROFILE=prod a view lê do alias "leitura" (outra conexão)
+    databases = "__all__"
+
+    def test_400(self):
+        for params in ({"criterio": "x"}, {"limit": "a"}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get("/api/duplicados/", params).status_code, 400)
+
+    def test_limit_maximo(self):
+        Patrimonio.objects.bulk_create(
+            Patrimonio(checklist=f"c{i}", content_hash=f"h{i // 2:05d}") for i in range(2 * 1001)
+        )
+        resp = self.client.get("/api/duplicados/", {"limit": 5000})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()["count"], 1000)
+        self.assertEqual(resp.json()["proximo"], "h00999")
+
+    def test_cursor_percorre_todos_os_grupos(self):
+        Patrimonio.objects.bulk_create(
+            Patrimonio(checklist=f"c{i}", content_hash=f"h{i // 2}") for i in range(10)
+        )
+        chaves, params = [], {"limit": 2}
+        while True:
+            pagina = self.client.get("/api/duplicados/", params).json()
+            chaves += [g["chave"] for g in pagina["results"]]
+            if not pagina["proximo"]:
+                break
+            params["depois"] = pagina["proximo"]
+        self.assertEqual(chaves, ["h0", "h1", "h2", "h3", "h4"])
+
+
+class SerializarValoresTests(TransactionTestCase):
+    # com DJANGO_DB_PROFILE=prod a listagem lê do alias "leitura" (outra conexão)
+    databases = "__all__"
+
+    def setUp(self):
+        # um registro com tudo preenchido e outro só com o mínimo (NULLs)
+        Patrimonio.objects.create(
+            checklist="c1",
+            cod_patrimonio="TECG-1197",
+            data=date(2025, 10, 16),
+            localizacao="Depósito \u2028 Central",
+            filial="Filial",
+            dropbox_link="https://www.dropbox.com/s/x/1.jpg",
+            ocr_raw="```json\n{\"patrimonio\": \"TECG-1197\"}",
+            coords_lat=Decimal("-23.550520"),
+            coords_lon=Decimal("0"),
+            coords_raw="-23.55,-46.63",
+            arquivo="IMG_1.jpg",
+            dropbox_path="/chk/IMG_1.jpg",
+            content_hash="ab" * 32,
+            client_modified=datetime(2025, 10, 16, 23, 41, 15, 123456, tzinfo=dt_timezone.utc),
+            processado_em=datetime(2025, 10, 17, 1, 2, 3, tzinfo=dt_timezone.utc),
+        )
+        Patrimonio.objects.create(checklist="c2", cod_patrimonio=None)
+
+    def test_mesma_saida_do_serializer(self):
+        qs = Patrimonio.objects.order_by("-id")
+        esperado = [dict(row) for row in PatrimonioSerializer(qs, many=True).data]
+        self.assertEqual(serializar_valores(qs), esperado)
+
+    def test_mesmo_json_renderizado(self):
+        qs = Patrimonio.objects.order_by("-id")
+        padrao = JSONRenderer().render(PatrimonioSerializer(qs, many=True).data)
+        rapido = FastJSONRenderer().render(serializar_valores(qs))
+        self.assertEqual(json.loads(rapido), json.loads(padrao))
+        self.assertIn(b"\\u2028", rapido)
+
+    def test_listagem_da_api(self):
+        resp = self.client.get("/api/patrimonios/")
+        self.assertEqual(resp.status_code, 200)
+        qs = Patrimonio.objects.order_by("-id")
+        self.assertEqual(resp.json(), json.loads(JSONRenderer().render(PatrimonioSerializer(qs, many=True).data)))
+
+
+@contextmanager
+def backend_json(nome):
+    """
+    Recarrega inventario.fastjson com o orjson ("orjson") ou sem ele ("json").
+    Renderer, parser e importador usam fastjson.dumps/loads pelo módulo.
+    """
+    bloqueio = {} if nome == "orjson" else {"orjson": None}
+    try:
+        with mock.patch.dict(sys.modules, bloqueio):
+            importlib.reload(fastjson)
+            if nome == "orjson" and fastjson.orjson is None:
+                raise unittest.SkipTest("orjson não instalado")
+            yield
+    finally:
+        importlib.reload(fastjson)
+
+
+class FastJSONTests(TestCase):
+    BACKENDS = ("orjson", "json")
+
+    def test_dumps_igual_ao_jsonrenderer(self):
+        data = {
+            "dt": datetime(2025, 10, 16, 23, 41, 15, 123456, tzinfo=dt_timezone.utc),
+            "d": date(2025, 10, 16),
+            "n": Decimal("-23.550520"),
+            "s": "Depósito \u2028 Central",
+            "l": [1, None, True, 0.5],
+        }
+        padrao = JSONRenderer().render(data)
+        for nome in self.BACKENDS:
+            with self.subTest(backend=nome), backend_json(nome):
+                self.assertEqual(FastJSONRenderer().render(data), padrao)
+
+    def test_loads_recusa_nan_e_infinity(self):
+        for nome in self.BACKENDS:
+            with self.subTest(backend=nome), backend_json(nome):
+                self.assertEqual(fastjson.loads('{"a": "São", "b": 1.5}'.encode()), {"a": "São", "b": 1.5})
+                for raw in (b'{"a": NaN}', b'{"a": Infinity}', b'[-Infinity]'):
+                    with self.assertRaises(ValueError):
+                        fastjson.loads(raw)
+
+    def test_dumps_nan(self):
+        with backend_json("json"), self.assertRaises(ValueError):
+            fastjson.dumps({"a": float("nan")})
+        with backend_json("orjson"):
+            self.assertEqual(fastjson.dumps({"a": float("nan")}), b'{"a":null}')
+
+    def test_parser(self):
+        for nome in self.BACKENDS:
+            with self.subTest(backend=nome), backend_json(nome):
+                parser = FastJSONParser()
+                self.assertEqual(parser.parse(BytesIO('{"a": "São"}'.encode())), {"a": "São"})
+                self.assertEqual(
+                    parser.parse(BytesIO('{"a": "São"}'.encode("latin-1")), parser_context={"encoding": "latin-1"}),
+                    {"a": "São"},
+                )
+                for raw in (b'{"a": NaN}', b'{"a": ', b'\xff'):
+                    with self.assertRaises(ParseError):
+                        parser.parse(BytesIO(raw))
+
+    def test_api_rejeita_nan(self):
+        for nome in self.BACKENDS:
+            with self.subTest(backend=nome), backend_json(nome):
+                resp = self.client.post("/api/fila/pendentes/reservar/", data='{"tamanho": NaN}',
+                                        content_type="application/json")
+                self.assertEqual(resp.status_code, 400)
+
+    def test_importador(self):
+        registros = [{"checklist": "imp-1", "cod_patrimonio": "TECG-1197", "localizacao": "Depósito"}]
+        for nome in self.BACKENDS:
+            with self.subTest(backend=nome), backend_json(nome), tempfile.TemporaryDirectory() as pasta:
+                arquivo = Path(pasta) / "resultado_db.json"
+                arquivo.write_text(json.dumps({"records": registros}, ensure_ascii=False), encoding="utf-8")
+                call_command("importar_patrimonios", arquivo=str(arquivo), quiet=True, stdout=StringIO())
+                self.assertEqual(Patrimonio.objects.get(checklist="imp-1").localizacao, "Depósito")
+
+                for conteudo in ('[{"checklist": "imp-2", "coords_lat": NaN}]', "[{"):
+                    arquivo.write_text(conteudo, encoding="utf-8")
+                    with self.assertRaisesMessage(CommandError, "JSON inválido"):
+                        call_command("importar_patrimonios", arquivo=str(arquivo), quiet=True, stdout=StringIO())
+                self.assertFalse(Patrimonio.objects.filter(checklist="imp-2").exists())
+
+
+class MetricsTimeseriesTests(TransactionTestCase):
+    # TransactionTestCase: a view assíncrona consulta em outra thread/conexão
+    databases = "__all__"
+    def setUp(self):
+        Patrimonio.objects.create(
+            checklist="c1", cod_patrimonio="TECG-1197",
+            processado_em=datetime(2025, 10, 17, 12, tzinfo=dt_timezone.utc),
+        )
+        Patrimonio.objects.create(
+            checklist="c2", cod_patrimonio="PEND-1",
+            processado_em=datetime(2025, 10, 17, 13, tzinfo=dt_timezone.utc),
+        )
+        # importador e POST da API aceitam processado_em vazio
+        Patrimonio.objects.create(checklist="c3", cod_patrimonio="TPTA00123")
+
+    def test_ignora_processado_em_nulo(self):
+        esperado = {
+            "labels": ["2025-10-17"],
+            "series": {"total": [2], "lidos": [1], "pend": [1], "pct_ok": [50]},
+        }
+        for url in ("/api/metrics/timeseries/", "/api/async/metrics/timeseries/"):
+            with self.subTest(url=url):
+                resp = self.client.get(url)
+                self.assertEqual(resp.status_code, 200)
+                self.assertEqual(resp.json(), esperado)
+
+
+@override_settings(TIME_ZONE="America/Sao_Paulo")
+class MetricsOverviewTests(TransactionTestCase):
+    databases = "__all__"
+
+    def _em(self, d, hora=12, minuto=0):
+        return make_aware(datetime(2025, 10, d, hora, minuto))
+
+    def setUp(self):
+        # "hoje" é quarta, 15/10/2025 (semana começa na segunda, 13/10)
+        self.agora = self._em(15, 15)
+        criar = Patrimonio.objects.create
+        criar(checklist="h1", cod_patrimonio="TPTA00123", processado_em=self._em(15, 0, 0))
+        criar(checklist="h2", cod_patrimonio="PEND-1", processado_em=self._em(15, 10))
+        # 23:30 em São Paulo já é dia 16 em UTC: continua sendo "hoje"
+        criar(checklist="h3", cod_patrimonio="TPTA00124", processado_em=self._em(15, 23, 30))
+        criar(checklist="o1", cod_patrimonio="TPTA00125", processado_em=self._em(14, 23, 59))
+        criar(checklist="o2", cod_patrimonio="TPTA00126", processado_em=self._em(14, 9))
+        criar(checklist="s1", cod_patrimonio="TPTA00127", processado_em=self._em(13, 0, 0))
+        # semana anterior: 06/10 a 12/10
+        criar(checklist="a1", cod_patrimonio="TPTA00128", processado_em=self._em(12, 23, 59))
+        criar(checklist="a2", cod_patrimonio="PEND-2", processado_em=self._em(6, 0, 0))
+        criar(checklist="a3", cod_patrimonio="TPTA00129", processado_em=self._em(8))
+        # fora de tudo
+        criar(checklist="x1", cod_patrimonio="TPTA00130", processado_em=self._em(5, 23, 59))
+        criar(checklist="x2", cod_patrimonio="TPTA00131")
+
+    def test_sync_e_async_iguais(self):
+        esperado = {
+            "today": {"total": 3, "ok": 2, "pct": 66.7, "delta_vs_yesterday": 50},
+            "week": {"total": 6, "ok": 5, "pct": 83.3, "delta_vs_prevweek": 100},
+        }
+        with mock.patch("django.utils.timezone.now", return_value=self.agora), \
+                mock.patch("inventario.async_views.now", return_value=self.agora):
+            sync = self.client.get("/api/metrics/overview/")
+            assincrona = self.client.get("/api/async/metrics/overview/")
+        self.assertEqual(sync.status_code, 200)
+        self.assertEqual(assincrona.status_code, 200)
+        self.assertEqual(sync.json(), esperado)
+        self.assertEqual(assincrona.json(), esperado)
+
+
+class AsyncPatrimoniosTests(TransactionTestCase):
+    databases = "__all__"
+
+    def setUp(self):
+        Patrimonio.objects.bulk_create(
+            Patrimonio(checklist=f"c{i}", cod_patrimonio=f"TPTA{i:05d}", coords_lat=Decimal("-23.5"),
+                       processado_em=datetime(2025, 10, 17, 12, i, tzinfo=dt_timezone.utc))
+            for i in range(7)
+        )
+        Patrimonio.objects.create(checklist="vazio")
+
+    def test_mesmos_registros_da_listagem(self):
+        todos = self.client.get("/api/patrimonios/").json()
+        for params, fatia in (({}, slice(None)), ({"limit": 3}, slice(0, 3)),
+                              ({"limit": 3, "offset": 6}, slice(6, 9)), ({"offset": 50}, slice(50, None))):
+            with self.subTest(params=params):
+                resp = self.client.get("/api/async/patrimonios/", params)
+                self.assertEqual(resp.status_code, 200)
+                self.assertEqual(resp.json(), {"count": 8, "results": todos[fatia]})
+
+    def test_400(self):
+        for params in ({"limit": "a"}, {"offset": "x"}, {"limit": "1.5"}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get("/api/async/patrimonios/", params).status_code, 400)
+
+
+class LeituraRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = LeituraRouter()
+        patcher = mock.patch("inventario.routers.connections", mock.Mock(settings={"default": {}, ALIAS_LEITURA: {}}))
+        self.connections = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _alias(self):
+        return self.router.db_for_read(Patrimonio)
+
+    def test_so_dentro_de_leitura(self):
+        self.assertIsNone(self._alias())
+        with leitura():
+            self.assertEqual(self._alias(), ALIAS_LEITURA)
+            self.assertIsNone(self.router.db_for_write(Patrimonio))
+        self.assertIsNone(self._alias())
+
+        with self.assertRaises(ZeroDivisionError), leitura():
+            1 / 0
+        self.assertIsNone(self._alias())
+
+    def test_sem_alias_nao_faz_nada(self):
+        del self.connections.settings[ALIAS_LEITURA]
+        with leitura():
+            self.assertIsNone(self._alias())
+
+    def test_view_sincrona(self):
+        @somente_leitura
+        def view():
+            return self._alias()
+
+        self.assertEqual(view(), ALIAS_LEITURA)
+        self.assertIsNone(self._alias())
+
+    def test_view_assincrona(self):
+        @somente_leitura
+        async def view():
+            # o ContextVar acompanha o sync_to_async até a thread do pool
+            em_thread = await sync_to_async(self._alias, thread_sensitive=False)()
+            return self._alias(), em_thread
+
+        self.assertTrue(iscoroutinefunction(view))
+        self.assertEqual(async_to_sync(view)(), (ALIAS_LEITURA, ALIAS_LEITURA))
+        self.assertIsNone(self._alias())
+
+    def test_nao_migra_leitura(self):
+        self.assertIs(self.router.allow_migrate(ALIAS_LEITURA, "inventario"), False)
+        self.assertIsNone(self.router.allow_migrate("default", "inventario"))
+
+
+@skipUnless(ALIAS_LEITURA in settings.DATABASES, "só com DJANGO_DB_PROFILE=prod")
+class LeituraRoteamentoTests(TransactionTestCase):
+    databases = "__all__"
+
+    def _consultas(self, fazer):
+        with CaptureQueriesContext(connections["default"]) as default, \
+                CaptureQueriesContext(connections[ALIAS_LEITURA]) as leit:
+            fazer()
+        return len(default), len(leit)
+
+    def test_views_de_leitura_usam_o_alias(self):
+        for url in ("/api/metrics/overview/", "/api/patrimonios/", "/api/duplicados/"):
+            with self.subTest(url=url):
+                default, leit = self._consultas(lambda: self.assertEqual(self.client.get(url).status_code, 200))
+                self.assertEqual(default, 0)
+                self.assertGreater(leit, 0)
+
+    def test_view_assincrona_usa_o_alias(self):
+        # as consultas rodam numa thread do pool, com conexões próprias:
+        # aqui vale conferir a decisão do router
+        rotas = []
+        original = LeituraRouter.db_for_read
+
+        def espiao(router, model, **hints):
+            rotas.append(original(router, model, **hints))
+            return rotas[-1]
+
+        with mock.patch.object(LeituraRouter, "db_for_read", espiao):
+            for url in ("/api/async/metrics/overview/", "/api/async/metrics/timeseries/",
+                        "/api/async/patrimonios/"):
+                self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertGreaterEqual(len(rotas), 3)
+        self.assertEqual(set(rotas), {ALIAS_LEITURA})
+
+    def test_escrita_fica_no_default(self):
+        Patrimonio.objects.create(checklist="p0", cod_patrimonio="PEND-0")
+        default, leit = self._consultas(lambda: self.client.post(
+            "/api/fila/pendentes/reservar/", data="{}", content_type="application/json"))
+        self.assertGreater(default, 0)
+        self.assertEqual(leit, 0)
+
+
+class PerfilProdTests(SimpleTestCase):
+    SCRIPT = textwrap.dedent("""
+        import json, django
+        django.setup()
+        from django.db import connections
+        out = {}
+        # "leitura" primeiro: o WAL não pode depender da ordem de abertura
+        for alias in ("leitura", "default"):
+            with connections[alias].cursor() as c:
+                out[alias] = {}
+                for pragma in ("journal_mode", "query_only", "synchronous", "busy_timeout"):
+                    c.execute("PRAGMA " + pragma)
+                    out[alias][pragma] = c.fetchone()[0]
+        try:
+            with connections["leitura"].cursor() as c:
+                c.execute("CREATE TABLE t (x)")
+            out["escrita_leitura"] = "ok"
+        except Exception as e:
+            out["escrita_leitura"] = str(e)
+        print(json.dumps(out))
+    """)
+
+    def test_pragmas(self):
+        with tempfile.TemporaryDirectory() as pasta:
+            env = dict(
+                os.environ, PYTHONPATH=str(settings.BASE_DIR), DJANGO_SETTINGS_MODULE="core.settings",
+                DJANGO_DB_PROFILE="prod", DJANGO_SQLITE_PATH=str(Path(pasta) / "prod.sqlite3"),
+            )
+            proc = subprocess.run([sys.executable, "-c", self.SCRIPT], env=env, capture_output=True, text=True)
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        out = json.loads(proc.stdout)
+        self.assertEqual(out["leitura"], {"journal_mode": "wal", "query_only": 1, "synchronous": 1, "busy_timeout": 5000})
+        self.assertEqual(out["default"], {"journal_mode": "wal", "query_only": 0, "synchronous": 1, "busy_timeout": 5000})
+        self.assertIn("readonly", out["escrita_leitura"])
+
+
+class PendenteGeradoTests(TestCase):
+    def test_pendente_acompanha_cod_patrimonio(self):
+        Patrimonio.objects.bulk_create([
+            Patrimonio(checklist="c1", cod_patrimonio="PEND-1"),
+            Patrimonio(checklist="c2", cod_patrimonio="pend-2"),
+            Patrimonio(checklist="c3", cod_patrimonio="TECG-1197"),
+            Patrimonio(checklist="c4", cod_patrimonio=None),
+        ])
+        pendentes = set(Patrimonio.objects.filter(pendente=True).values_list("checklist", flat=True))
+        self.assertEqual(pendentes, {"c1", "c2"})
+
+        # update() direto também recalcula
+        Patrimonio.objects.filter(checklist="c1").update(cod_patrimonio="TPTA00123")
+        Patrimonio.objects.filter(checklist="c3").update(cod_patrimonio="PEND-3")
+        pendentes = set(Patrimonio.objects.filter(pendente=True).values_list("checklist", flat=True))
+        self.assertEqual(pendentes, {"c2", "c3"})
+
+
+class FilaTests(TestCase):
+    def setUp(self):
+        self.ids = [
+            Patrimonio.objects.create(checklist=f"p{i}", cod_patrimonio=f"PEND-{i}").pk
+            for i in range(6)
+        ]
+        Patrimonio.objects.create(checklist="ok", cod_patrimonio="TPTA00123")
+
+    def _ids(self, lote):
+        return [r["id"] for r in lote["registros"]]
+
+    def test_reservas_nao_se_sobrepoem(self):
+        a = fila.reservar(4)
+        b = fila.reservar(4)
+        self.assertEqual(self._ids(a), self.ids[:4])
+        self.assertEqual(self._ids(b), self.ids[4:])
+        self.assertEqual(fila.reservar(4)["registros"], [])
+        self.assertNotEqual(a["token"], b["token"])
+
+    def test_releitura_do_lote_usa_o_indice_parcial(self):
+        with CaptureQueriesContext(connection) as consultas:
+            lote = fila.reservar(4)
+        self.assertEqual(self._ids(lote), self.ids[:4])
+        releitura = consultas.captured_queries[-1]["sql"]
+        self.assertTrue(releitura.startswith("SELECT"), releitura)
+        with connection.cursor() as cursor:
+            cursor.execute("EXPLAIN QUERY PLAN " + releitura)
+            plano = " / ".join(row[3] for row in cursor.fetchall())
+        self.assertIn("SEARCH inventario_patrimonio USING INDEX patrimonio_pendente_fila_idx", plano)
+        self.assertNotIn("SCAN", plano)
+
+    def test_reserva_vencida_volta_para_a_fila(self):
+        a = fila.reservar(2, duracao=timedelta(minutes=1))
+        Patrimonio.objects.filter(reserva_token=a["token"]).update(proxima_tentativa=now() - timedelta(seconds=1))
+        # nunca tentados primeiro, depois os de reserva vencida
+        self.assertEqual(self._ids(fila.reservar(4)), self.ids[2:])
+        self.assertEqual(self._ids(fila.reservar(4)), self.ids[:2])
+
+    def test_concluir_rejeita_token_alheio_ou_vencido(self):
+        a = fila.reservar(2, duracao=timedelta(minutes=1))
+        fila.reservar(4)
+        Patrimonio.objects.filter(reserva_token=a["token"]).update(proxima_tentativa=now() - timedelta(seconds=1))
+        b = fila.reservar(2)
+        self.assertEqual(self._ids(b), self._ids(a))
+
+        resultados = [{"id": pk, "cod_patrimonio": "TECG-1197"} for pk in self._ids(a)]
+        self.assertEqual(
+            fila.concluir(a["token"], resultados),
+            {"concluidos": [], "liberados": [], "rejeitados": self._ids(a)},
+        )
+        self.assertEqual(fila.concluir("outro", resultados)["rejeitados"], self._ids(a))
+        self.assertEqual(fila.concluir(b["token"], resultados)["concluidos"], self._ids(b))
+
+    def test_concluir_atualiza_registro(self):
+        a = fila.reservar(1)
+        pk = self._ids(a)[0]
+        out = fila.concluir(a["token"], [{"id": pk, "cod_patrimonio": "TECG-1197", "ocr_raw": "novo"}])
+        self.assertEqual(out["concluidos"], [pk])
+        obj = Patrimonio.objects.get(pk=pk)
+        self.assertFalse(obj.pendente)
+        self.assertEqual(obj.cod_patrimonio, "TECG-1197")
+        self.assertEqual(obj.cod_normalizado, "TEC61197")
+        self.assertEqual(obj.ocr_raw, "novo")
+        self.assertEqual(obj.reserva_token, "")
+        self.assertIsNotNone(obj.processado_em)
+
+    def test_falha_volta_com_backoff(self):
+        a = fila.reservar(2)
+        out = fila.concluir(a["token"], [{"id": self.ids[0]}, {"id": self.ids[1], "cod_patrimonio": "PEND-x"}])
+        self.assertEqual(out["liberados"], self.ids[:2])
+        obj = Patrimonio.objects.get(pk=self.ids[0])
+        self.assertTrue(obj.pendente)
+        self.assertEqual(obj.tentativas, 1)
+        self.assertEqual(obj.reserva_token, "")
+        self.assertGreater(obj.proxima_tentativa, now())
+        # não volta para a frente da fila
+        self.assertEqual(self._ids(fila.reservar(6)), self.ids[2:])
+
+    def test_estaciona_apos_max_tentativas(self):
+        pk = self.ids[0]
+        Patrimonio.objects.exclude(pk=pk).delete()
+        for _ in range(fila.MAX_TENTATIVAS):
+            # simula o fim do backoff
+            Patrimonio.objects.filter(pk=pk).update(proxima_tentativa=None)
+            a = fila.reservar(1)
+            self.assertEqual(self._ids(a), [pk])
+            fila.concluir(a["token"], [{"id": pk}])
+        Patrimonio.objects.filter(pk=pk).update(proxima_tentativa=None)
+        self.assertEqual(fila.reservar(1)["registros"], [])
+        self.assertEqual(fila.status()["estacionados"], 1)
+
+
+class FilaApiTests(TestCase):
+    def setUp(self):
+        Patrimonio.objects.create(checklist="p0", cod_patrimonio="PEND-0")
+
+    def _post(self, url, body):
+        return self.client.post(url, data=json.dumps(body), content_type="application/json")
+
+    def test_reservar_e_concluir(self):
+        resp = self._post("/api/fila/pendentes/reservar/", {"tamanho": 5})
+        self.assertEqual(resp.status_code, 200)
+        lote = resp.json()
+        self.assertEqual(len(lote["registros"]), 1)
+        resp = self._post("/api/fila/pendentes/concluir/", {
+            "token": lote["token"],
+            "resultados": [{"id": lote["registros"][0]["id"], "cod_patrimonio": "TPTA00123"}],
+        })
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(resp.json()["concluidos"]), 1)
+        self.assertEqual(self.client.get("/api/fila/pendentes/").json()["pendentes"], 0)
+
+    def test_reservar_400(self):
+        maximo = int(fila.RESERVA_MAXIMA.total_seconds())
+        for body in ([1], [], {"tamanho": 0}, {"tamanho": fila.LOTE_MAXIMO + 1},
+                     {"tamanho": "a"}, {"reserva_segundos": 0}, {"tamanho": None},
+                     {"reserva_segundos": maximo + 1}, {"reserva_segundos": 300000000000}):
+            with self.subTest(body=body):
+                self.assertEqual(self._post("/api/fila/pendentes/reservar/", body).status_code, 400)
+        self.assertEqual(self._post("/api/fila/pendentes/reservar/", {"reserva_segundos": maximo}).status_code, 200)
+
+    def test_concluir_400(self):
+        for body in ([1], [], {"resultados": []}, {"token": "t"}, {"token": "t", "resultados": {}},
+                     {"token": 1, "resultados": []}, {"token": "t", "resultados": [1]},
+                     {"token": "t", "resultados": [{"cod_patrimonio": "X"}]},
+                     {"token": "t", "resultados": [{"id": "a"}]}):
+            with self.subTest(body=body):
+                self.assertEqual(self._post("/api/fila/pendentes/concluir/", body).status_code, 400)
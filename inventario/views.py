@@ -6,82 +6,113 @@ from datetime import date, timedelta
 from .models import Patrimonio
 from rest_framework import viewsets
 from .models import Patrimonio            # ⬅️ se seu modelo tiver outro nome, troque aqui
-from .serializers import PatrimonioSerializer
+from .serializers import PatrimonioSerializer, serializar_valores
+from .duplicados import CRITERIOS, iter_grupos
+from .routers import leitura, somente_leitura
+from . import fila
 
 
 class PatrimonioViewSet(viewsets.ModelViewSet):
     queryset = Patrimonio.objects.all().order_by("-id")
     serializer_class = PatrimonioSerializer
 
-def not_pend_q():                                       
-    return ~Q(cod_patrimonio__iregex=r'^PEND')
+    def list(self, request, *args, **kwargs):
+        # listagem é só leitura: monta a resposta direto de values_list()
+        with leitura():
+            queryset = self.filter_queryset(self.get_queryset())
+            page = self.paginate_queryset(queryset.values_list("pk", flat=True))
+            if page is not None:
+                rows = serializar_valores(queryset.filter(pk__in=list(page)))
+                return self.get_paginated_response(rows)
+            return Response(serializar_valores(queryset))
 
-@api_view(["GET"])
-def metrics_overview(request):
+def not_pend_q():
+    # "pendente" é coluna gerada pelo banco (cod_patrimonio começando com PEND)
+    return ~Q(pendente=True)
+
+def _inicio_do_dia(d):
+    from datetime import datetime, time
+    from django.utils.timezone import make_aware
+    return make_aware(datetime.combine(d, time.min))
+
+def overview_agregados(today):
     """
-    Resumo para cards: hoje, semana.
+    Agregados do resumo numa única query (Count com filter por período).
+    Filtra por faixa de datetime (equivale a __date no fuso atual, sem
+    chamar a função de data do banco em cada linha).
     """
-    from django.utils.timezone import now
-    today = now().date()
     start_week = today - timedelta(days=today.weekday())  # segunda
     prev_week_start = start_week - timedelta(days=7)
-    prev_week_end   = start_week - timedelta(days=1)
 
-    qs = Patrimonio.objects.all()
+    hoje, amanha = _inicio_do_dia(today), _inicio_do_dia(today + timedelta(days=1))
+    ontem = _inicio_do_dia(today - timedelta(days=1))
+    semana, semana_anterior = _inicio_do_dia(start_week), _inicio_do_dia(prev_week_start)
 
-    # HOJE
-    hoje_qs = qs.filter(processado_em__date=today)
-    hoje_total = hoje_qs.count()
-    hoje_lidos = hoje_qs.filter(not_pend_q()).count()
-    hoje_pct   = round(100 * (hoje_lidos / hoje_total), 1) if hoje_total else 0
-
-    # SEMANA ATUAL
-    sem_qs = qs.filter(processado_em__date__gte=start_week)
-    sem_total = sem_qs.count()
-    sem_lidos = sem_qs.filter(not_pend_q()).count()
-    sem_pct   = round(100 * (sem_lidos / sem_total), 1) if sem_total else 0
+    q_hoje = Q(processado_em__gte=hoje, processado_em__lt=amanha)
+    q_semana = Q(processado_em__gte=semana)
+    return Patrimonio.objects.filter(processado_em__gte=min(ontem, semana_anterior)).aggregate(
+        hoje=Count("id", filter=q_hoje),
+        hoje_ok=Count("id", filter=q_hoje & not_pend_q()),
+        ontem=Count("id", filter=Q(processado_em__gte=ontem, processado_em__lt=hoje)),
+        semana=Count("id", filter=q_semana),
+        semana_ok=Count("id", filter=q_semana & not_pend_q()),
+        semana_anterior=Count("id", filter=Q(processado_em__gte=semana_anterior, processado_em__lt=semana)),
+    )
 
-    # SEMANA ANTERIOR (para variação)
-    prev_qs = qs.filter(processado_em__date__gte=prev_week_start,
-                        processado_em__date__lte=prev_week_end)
-    prev_total = prev_qs.count()
+def overview_payload(r):
+    """
+    Monta a resposta do resumo a partir de overview_agregados().
+    """
+    def pct(ok, total):
+        return round(100 * (ok / total), 1) if total else 0
 
     def delta_pct(curr, prev):
         if not prev: return 0
         return round(100 * (curr - prev) / prev)
 
-    return Response({
-        "today":   {"total": hoje_total, "ok": hoje_lidos, "pct": hoje_pct, "delta_vs_yesterday": delta_pct(hoje_total, qs.filter(processado_em__date=today - timedelta(days=1))).__int__()},
-        "week":    {"total": sem_total,  "ok": sem_lidos,  "pct": sem_pct,  "delta_vs_prevweek": delta_pct(sem_total, prev_total)},
-    })
+    return {
+        "today":   {"total": r["hoje"],   "ok": r["hoje_ok"],   "pct": pct(r["hoje_ok"], r["hoje"]),
+                    "delta_vs_yesterday": delta_pct(r["hoje"], r["ontem"])},
+        "week":    {"total": r["semana"], "ok": r["semana_ok"], "pct": pct(r["semana_ok"], r["semana"]),
+                    "delta_vs_prevweek": delta_pct(r["semana"], r["semana_anterior"])},
+    }
 
 @api_view(["GET"])
-def metrics_timeseries(request):
+@somente_leitura
+def metrics_overview(request):
     """
-    Série temporal para o gráfico (por dia).
-    Query params opcionais: ?from=YYYY-MM-DD&to=YYYY-MM-DD
+    Resumo para cards: hoje, semana.
+    """
+    from django.utils.timezone import now
+    return Response(overview_payload(overview_agregados(now().date())))
+
+def timeseries_queryset(params):
+    """
+    Agregado por dia. Query params opcionais: from, to (YYYY-MM-DD).
     """
     from django.utils.dateparse import parse_date
-    from_param = parse_date(request.GET.get("from") or "")
-    to_param   = parse_date(request.GET.get("to") or "")
+    from_param = parse_date(params.get("from") or "")
+    to_param   = parse_date(params.get("to") or "")
 
-    qs = Patrimonio.objects.all()
+    # sem processado_em não há dia para agrupar
+    qs = Patrimonio.objects.filter(processado_em__isnull=False)
     if from_param:
         qs = qs.filter(processado_em__date__gte=from_param)
     if to_param:
         qs = qs.filter(processado_em__date__lte=to_param)
 
-    agg = (
+    return (
         qs.annotate(day=TruncDay("processado_em"))
           .values("day")
           .annotate(
               total=Count("id"),
               ok=Count("id", filter=not_pend_q()),
-              pend=Count("id", filter=Q(cod_patrimonio__iregex=r'^PEND')),
+              pend=Count("id", filter=Q(pendente=True)),
           )
           .order_by("day")
     )
 
+def timeseries_payload(agg):
     # monta arrays para MUI X Charts
     labels = []
     total  = []
@@ -95,7 +126,7 @@ def metrics_timeseries(request):
         pend.append(row["pend"])
         pct_ok.append( round(100*row["ok"]/row["total"]) if row["total"] else 0 )
 
-    return Response({
+    return {
         "labels": labels,
         "series": {
             "total": total,
@@ -103,4 +134,84 @@ def metrics_timeseries(request):
             "pend": pend,
             "pct_ok": pct_ok
         }
-    })
+    }
+
+@api_view(["GET"])
+@somente_leitura
+def metrics_timeseries(request):
+    """
+    Série temporal para o gráfico (por dia).
+    Query params opcionais: ?from=YYYY-MM-DD&to=YYYY-MM-DD
+    """
+    return Response(timeseries_payload(timeseries_queryset(request.GET)))
+
+@api_view(["GET"])
+@somente_leitura
+def duplicados(request):
+    """
+    Grupos de possíveis duplicados, em ordem de chave.
+    Query params opcionais: ?criterio=hash|codigo (padrão: hash)&limit=N (padrão: 100, máx.: 1000)
+    &depois=<chave> (cursor: passe o "proximo" da página anterior)
+    """
+    from itertools import islice
+    criterio = request.GET.get("criterio") or "hash"
+    if criterio not in CRITERIOS:
+        return Response({"detail": f"criterio inválido: {criterio}"}, status=400)
+    try:
+        limit = max(1, min(int(request.GET.get("limit") or 100), 1000))
+    except ValueError:
+        return Response({"detail": "limit deve ser inteiro"}, status=400)
+
+    depois = request.GET.get("depois") or ""
+
+    grupos = list(islice(iter_grupos(criterio, depois=depois), limit))
+    proximo = grupos[-1]["chave"] if len(grupos) == limit else None
+    return Response({"criterio": criterio, "count": len(grupos), "proximo": proximo, "results": grupos})
+
+@api_view(["GET"])
+def fila_status(request):
+    """
+    Tamanho da fila de reprocessamento (PEND): disponíveis, reservados e estacionados.
+    """
+    return Response(fila.status())
+
+@api_view(["POST"])
+def fila_reservar(request):
+    """
+    Reserva um lote de pendentes para um worker.
+    Body opcional: {"tamanho": 50 (máx.: 500), "reserva_segundos": 600 (máx.: 21600)}
+    """
+    if not isinstance(request.data, dict):
+        return Response({"detail": "o corpo deve ser um objeto JSON"}, status=400)
+    try:
+        tamanho = int(request.data.get("tamanho", 50))
+        segundos = int(request.data.get("reserva_segundos", fila.RESERVA_PADRAO.total_seconds()))
+    except (TypeError, ValueError):
+        return Response({"detail": "tamanho/reserva_segundos devem ser inteiros"}, status=400)
+    if not 1 <= tamanho <= fila.LOTE_MAXIMO:
+        return Response({"detail": f"tamanho deve estar entre 1 e {fila.LOTE_MAXIMO}"}, status=400)
+    maximo = int(fila.RESERVA_MAXIMA.total_seconds())
+    if not 1 <= segundos <= maximo:
+        return Response({"detail": f"reserva_segundos deve estar entre 1 e {maximo}"}, status=400)
+
+    return Response(fila.reservar(tamanho, timedelta(seconds=segundos)))
+
+@api_view(["POST"])
+def fila_concluir(request):
+    """
+    Callback do worker ao terminar o lote.
+    Body: {"token": "...", "resultados": [{"id": 1, "cod_patrimonio": "...", "ocr_raw": "..."}]}
+    """
+    if not isinstance(request.data, dict):
+        return Response({"detail": "o corpo deve ser um objeto JSON"}, status=400)
+    token = request.data.get("token")
+    resultados = request.data.get("resultados")
+    if not token or not isinstance(token, str) or not isinstance(resultados, list):
+        return Response({"detail": "informe token e resultados (lista)"}, status=400)
+    if not all(isinstance(r, dict) for r in resultados):
+        return Response({"detail": "cada resultado deve ser um objeto com id"}, status=400)
+    try:
+        resultado = fila.concluir(token, resultados)
+    except (KeyError, TypeError, ValueError):
+        return Response({"detail": "cada resultado precisa de um id inteiro"}, status=400)
+    return Response(resultado)